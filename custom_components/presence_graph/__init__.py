@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import logging
 import time
+from collections.abc import Callable, Mapping
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
@@ -25,6 +26,7 @@ from .graph_engine import GraphEngine
 from .model import Link, Space
 
 _LOGGER = logging.getLogger(__name__)
+_MISSING = object()
 
 
 async def async_setup(hass: HomeAssistant, config: dict[str, Any]) -> bool:
@@ -47,8 +49,8 @@ async def async_setup(hass: HomeAssistant, config: dict[str, Any]) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     model = _entry_model(entry)
-    time_source = getattr(hass.loop, "time", None)
-    engine = GraphEngine(model["spaces"], model["links"], time_func=time_source or time.monotonic)
+    time_source = getattr(hass.loop, "time", time.monotonic)
+    engine = GraphEngine(model["spaces"], model["links"], time_func=time_source)
     coordinator = PresenceGraphCoordinator(hass, entry, engine)
     await coordinator.async_setup(model["spaces"], model["links"])
 
@@ -74,19 +76,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    model = _entry_model(entry)
     data = hass.data[DOMAIN][entry.entry_id]
+    model = _entry_model(entry, data[DATA_MODEL])
     coordinator: PresenceGraphCoordinator = data[DATA_COORDINATOR]
     await coordinator.async_reset(model["spaces"], model["links"])
     data[DATA_MODEL] = model
 
 
 async def _async_reload_all(hass: HomeAssistant) -> None:
-    for _entry_id, data in list(hass.data.get(DOMAIN, {}).items()):
+    # DATA_MODEL is rebuilt by the update listener whenever the entry changes, so it
+    # always mirrors the merged options/data view and can be reused as is.
+    for data in list(hass.data.get(DOMAIN, {}).values()):
         coordinator: PresenceGraphCoordinator = data[DATA_COORDINATOR]
-        model = _entry_model(coordinator.config_entry)
+        model = data[DATA_MODEL]
         await coordinator.async_reset(model["spaces"], model["links"])
-        data[DATA_MODEL] = model
 
 
 async def _async_set_space_included(hass: HomeAssistant, call: ServiceCall) -> None:
@@ -112,9 +115,32 @@ def _first_entry(hass: HomeAssistant) -> ConfigEntry | None:
     return domain_entries[0] if domain_entries else None
 
 
-def _entry_model(entry: ConfigEntry) -> dict[str, list[Any]]:
+def _entry_model(
+    entry: ConfigEntry, previous: dict[str, list[Any]] | None = None
+) -> dict[str, list[Any]]:
     raw_spaces = entry.options.get(CONF_SPACES, entry.data.get(CONF_SPACES, []))
     raw_links = entry.options.get(CONF_LINKS, entry.data.get(CONF_LINKS, []))
-    spaces = [Space(**space) for space in raw_spaces]
-    links = [Link(**link) for link in raw_links]
+    known_spaces = {space.id: space for space in previous["spaces"]} if previous else {}
+    known_links = {link.id: link for link in previous["links"]} if previous else {}
+    spaces = [_reuse_or_build(Space, space, known_spaces) for space in raw_spaces]
+    links = [_reuse_or_build(Link, link, known_links) for link in raw_links]
     return {"spaces": spaces, "links": links}
+
+
+def _reuse_or_build[ModelT: (Space, Link)](
+    factory: Callable[..., ModelT], raw: Mapping[str, Any], known: Mapping[str, ModelT]
+) -> ModelT:
+    """Return the previous instance when it already matches the raw definition.
+
+    Reusing instances keeps entities that hold a reference to a space in sync with the
+    engine across reloads.
+    """
+
+    current = known.get(raw.get("id"))
+    if (
+        current is not None
+        and len(raw) == len(current.__slots__)
+        and all(getattr(current, key, _MISSING) == value for key, value in raw.items())
+    ):
+        return current
+    return factory(**raw)
@@ -1,7 +1,10 @@
 """Binary sensors exposed by the Presence Graph integration."""
 from __future__ import annotations
 
+from collections.abc import Mapping, Sequence
 from datetime import datetime
+from math import isfinite
+from types import MappingProxyType
 
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
@@ -20,7 +23,9 @@ from .const import (
     DOMAIN,
 )
 from .coordinator import PresenceGraphCoordinator
-from .model import Link, Space
+from .model import Space
+
+_NO_ATTRIBUTES: Mapping[str, object] = MappingProxyType({})
 
 
 async def async_setup_entry(
@@ -30,14 +35,10 @@ async def async_setup_entry(
     coordinator: PresenceGraphCoordinator = data[DATA_COORDINATOR]
     model = data[DATA_MODEL]
     spaces: list[Space] = model["spaces"]
-    links: list[Link] = model["links"]
-    adjacency: dict[str, list[str]] = {space.id: [] for space in spaces}
-    for link in links:
-        adjacency.setdefault(link.from_space, []).append(link.to_space)
-        adjacency.setdefault(link.to_space, []).append(link.from_space)
+    adjacency = coordinator.adjacency
 
     sensors = [
-        PresenceGraphSpaceBinarySensor(coordinator, space, adjacency.get(space.id, []))
+        PresenceGraphSpaceBinarySensor(coordinator, space, adjacency.get(space.id, ()))
         for space in spaces
     ]
     async_add_entities(sensors)
@@ -50,11 +51,13 @@ class PresenceGraphSpaceBinarySensor(
     _attr_device_class = BinarySensorDeviceClass.OCCUPANCY
 
     def __init__(
-        self, coordinator: PresenceGraphCoordinator, space: Space, linked: list[str]
+        self, coordinator: PresenceGraphCoordinator, space: Space, linked: Sequence[str]
     ) -> None:
         super().__init__(coordinator)
         self._space = space
         self._linked = linked
+        self._last_event_ts: float | None = None
+        self._last_event_iso: str | None = None
         self._attr_unique_id = f"{coordinator.config_entry.entry_id}_{space.id}"
         self._attr_name = f"{space.name}"
 
@@ -64,19 +67,28 @@ class PresenceGraphSpaceBinarySensor(
         return state.occupied.get(self._space.id, False) if state else False
 
     @property
-    def extra_state_attributes(self) -> dict[str, object]:
+    def extra_state_attributes(self) -> Mapping[str, object]:
         state = self.coordinator.data
         if not state:
-            return {}
-        last_event = state.last_event_ts.get(self._space.id)
-        last_event_iso = None
-        if last_event:
-            last_event_iso = datetime.fromtimestamp(last_event).isoformat()
-        return {
-            ATTR_SCORE: round(state.scores.get(self._space.id, 0.0), 3),
-            ATTR_LAST_EVENT: last_event_iso,
+            return _NO_ATTRIBUTES
+        space_id = self._space.id
+        last_event = state.last_event_ts.get(space_id)
+        if last_event != self._last_event_ts:
+            self._last_event_ts = last_event
+            self._last_event_iso = (
+                datetime.fromtimestamp(last_event).isoformat()
+                if last_event and isfinite(last_event)
+                else None
+            )
+        attributes: dict[str, object] = {
+            ATTR_LAST_EVENT: self._last_event_iso,
             ATTR_INCLUDE_IN_TOTAL: self._space.include_in_total,
             ATTR_LINKED_SPACES: self._linked,
             ATTR_MOTION_ENTITIES: self._space.motion_entities,
             ATTR_PRESENCE_ENTITIES: self._space.presence_entities,
         }
+        # Scores are already rounded by the engine.
+        score = state.scores.get(space_id)
+        if score is not None:
+            attributes[ATTR_SCORE] = score
+        return attributes
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import inspect
-import json
+import re
 from typing import Any
 
 import voluptuous as vol
@@ -10,32 +10,16 @@ from homeassistant import config_entries
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import callback
 
-from .const import CONF_LINKS, CONF_SPACES, DOMAIN
-from .utils import ensure_unique_ids, slugify
-
-SPACE_FIELD = vol.Schema(
-    {
-        vol.Required("name"): str,
-        vol.Optional("id"): str,
-        vol.Optional("include_in_total", default=True): bool,
-        vol.Optional("timeout_s", default=120): int,
-        vol.Optional("motion_entities", default=list): list,
-        vol.Optional("presence_entities", default=list): list,
-    }
+from .const import (
+    CONF_LINKS,
+    CONF_SPACES,
+    DEFAULT_TIMEOUT,
+    DEFAULT_TRAVERSAL_LATENCY,
+    DOMAIN,
 )
+from .utils import ensure_unique_ids, json_dumps, json_loads, slugify
 
-LINK_FIELD = vol.Schema(
-    {
-        vol.Required("name"): str,
-        vol.Optional("id"): str,
-        vol.Required("from_space"): str,
-        vol.Required("to_space"): str,
-        vol.Optional("motion_entities", default=list): list,
-        vol.Optional("contact_entities", default=list): list,
-        vol.Optional("lock_entities", default=list): list,
-        vol.Optional("traversal_latency_s", default=8): int,
-    }
-)
+_NAME_SEPARATORS = re.compile(r"[,\r\n]+")
 
 
 class PresenceGraphConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -140,23 +124,19 @@ class PresenceGraphConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 class PresenceGraphOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: ConfigEntry) -> None:
         self.config_entry = config_entry
+        self._current_payloads: tuple[str, str] | None = None
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> config_entries.FlowResult:
-        current_spaces = self.config_entry.options.get(
-            CONF_SPACES, self.config_entry.data.get(CONF_SPACES, [])
-        )
-        current_links = self.config_entry.options.get(
-            CONF_LINKS, self.config_entry.data.get(CONF_LINKS, [])
-        )
         if user_input is None:
+            current_spaces, current_links = self._current_defaults()
             return await _ensure(self.async_show_form(
                 step_id="init",
                 data_schema=vol.Schema(
                     {
-                        vol.Required("spaces", default=json.dumps(current_spaces, indent=2)): str,
-                        vol.Required("links", default=json.dumps(current_links, indent=2)): str,
+                        vol.Required("spaces", default=current_spaces): str,
+                        vol.Required("links", default=current_links): str,
                     }
                 ),
             ))
@@ -194,53 +174,113 @@ class PresenceGraphOptionsFlowHandler(config_entries.OptionsFlow):
             )
         )
 
+    def _current_defaults(self) -> tuple[str, str]:
+        """Return the serialised entry model, computed once per flow."""
+
+        if self._current_payloads is None:
+            options = self.config_entry.options
+            data = self.config_entry.data
+            current_spaces = options.get(CONF_SPACES, data.get(CONF_SPACES, []))
+            current_links = options.get(CONF_LINKS, data.get(CONF_LINKS, []))
+            self._current_payloads = (
+                json_dumps(current_spaces, indent=True),
+                json_dumps(current_links, indent=True),
+            )
+        return self._current_payloads
+
 
 def _parse_spaces(payload: str) -> list[dict[str, Any]]:
     stripped = payload.strip()
     if not stripped:
         return []
     try:
-        data = json.loads(payload)
-    except json.JSONDecodeError:
+        data = json_loads(payload)
+    except ValueError:
         data = _coerce_space_names(payload)
     if not isinstance(data, list):
         raise ValueError
-    spaces: list[dict[str, Any]] = []
-    for raw in data:
-        validated = SPACE_FIELD(raw)
-        space_id = validated.get("id") or slugify(validated["name"])
-        spaces.append({**validated, "id": space_id})
+    spaces = [_validate_space_dict(raw) for raw in data]
     ensure_unique_ids(space["id"] for space in spaces)
     return spaces
 
 
 def _coerce_space_names(payload: str) -> list[dict[str, Any]]:
-    names: list[str] = []
-    for line in payload.splitlines():
-        parts = [part.strip() for part in line.split(",")]
-        for name in parts:
-            if name:
-                names.append(name)
+    names = [name for name in map(str.strip, _NAME_SEPARATORS.split(payload)) if name]
     if not names:
         raise ValueError
     return [{"name": name} for name in names]
 
 
 def _parse_links(payload: str) -> list[dict[str, Any]]:
-    data = json.loads(payload)
+    data = json_loads(payload)
     if not isinstance(data, list):
         raise ValueError
-    links: list[dict[str, Any]] = []
-    for raw in data:
-        validated = LINK_FIELD(raw)
-        link_id = validated.get("id") or slugify(
-            f"{validated['from_space']}_{validated['to_space']}_{validated['name']}"
-        )
-        links.append({**validated, "id": link_id})
+    links = [_validate_link_dict(raw) for raw in data]
     ensure_unique_ids(link["id"] for link in links)
     return links
 
 
+def _validate_space_dict(raw: Any) -> dict[str, Any]:
+    """Validate a raw space definition, fill defaults and assign its id."""
+
+    if not isinstance(raw, dict):
+        raise ValueError("Space definitions must be objects")
+    name = _typed_field(raw, "name", str)
+    return {
+        "name": name,
+        "id": _identifier(raw, name),
+        "include_in_total": _typed_field(raw, "include_in_total", bool, True),
+        "timeout_s": _typed_field(raw, "timeout_s", int, DEFAULT_TIMEOUT),
+        "motion_entities": _list_field(raw, "motion_entities"),
+        "presence_entities": _list_field(raw, "presence_entities"),
+    }
+
+
+def _validate_link_dict(raw: Any) -> dict[str, Any]:
+    """Validate a raw link definition, fill defaults and assign its id."""
+
+    if not isinstance(raw, dict):
+        raise ValueError("Link definitions must be objects")
+    name = _typed_field(raw, "name", str)
+    from_space = _typed_field(raw, "from_space", str)
+    to_space = _typed_field(raw, "to_space", str)
+    return {
+        "name": name,
+        "id": _identifier(raw, f"{from_space}_{to_space}_{name}"),
+        "from_space": from_space,
+        "to_space": to_space,
+        "motion_entities": _list_field(raw, "motion_entities"),
+        "contact_entities": _list_field(raw, "contact_entities"),
+        "lock_entities": _list_field(raw, "lock_entities"),
+        "traversal_latency_s": _typed_field(
+            raw, "traversal_latency_s", int, DEFAULT_TRAVERSAL_LATENCY
+        ),
+    }
+
+
+def _typed_field(raw: dict[str, Any], key: str, expected: type, default: Any = None) -> Any:
+    value = raw.get(key, default)
+    if not isinstance(value, expected):
+        raise ValueError(f"Invalid value for {key}")
+    return value
+
+
+def _list_field(raw: dict[str, Any], key: str) -> list[Any]:
+    value = raw.get(key)
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise ValueError(f"{key} must be a list")
+    return value
+
+
+def _identifier(raw: dict[str, Any], fallback: str) -> str:
+    identifier = raw.get("id") or slugify(fallback)
+    if not isinstance(identifier, str):
+        raise ValueError("Identifiers must be strings")
+    return identifier
+
+
 def _validate_spaces(spaces: list[dict[str, Any]]) -> list[str]:
     errors: list[str] = []
     ids = {space["id"] for space in spaces}
@@ -250,13 +290,10 @@ def _validate_spaces(spaces: list[dict[str, Any]]) -> list[str]:
 
 
 def _validate_links(spaces: list[dict[str, Any]], links: list[dict[str, Any]]) -> list[str]:
-    errors: list[str] = []
     space_ids = {space["id"] for space in spaces}
-    for link in links:
-        if link["from_space"] not in space_ids or link["to_space"] not in space_ids:
-            errors.append("missing_space")
-            break
-    return errors
+    referenced = {link["from_space"] for link in links}
+    referenced.update(link["to_space"] for link in links)
+    return ["missing_space"] if referenced - space_ids else []
 
 
 async def _ensure(value: Any) -> Any:
@@ -42,6 +42,11 @@ SERVICE_RELOAD_MODEL = "reload_model"
 SERVICE_SET_SPACE_INCLUDED = "set_space_included"
 SERVICE_FORCE_SPACE_STATE = "force_space_state"
 
+ENTITY_KIND_SPACE = 0
+ENTITY_KIND_LINK_MOTION = 1
+ENTITY_KIND_LINK_CONTACT = 2
+ENTITY_KIND_LINK_LOCK = 3
+
 DATA_ENGINE = "engine"
 DATA_COORDINATOR = "coordinator"
 DATA_MODEL = "model"
@@ -52,6 +57,7 @@ ENTRY_VERSION = 1
 DEFAULT_TIMEOUT = 120
 DEFAULT_TRAVERSAL_LATENCY = 8
 DEFAULT_DECAY_THRESHOLD = 0.2
+SCORE_PRECISION = 3
 MIN_EVENT_DURATION = 0.5
 LINK_EVENT_DEBOUNCE = 2.0
 
@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 import logging
+import time
+from datetime import UTC, datetime
+from itertools import chain
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from .const import (
@@ -16,13 +19,23 @@ from .const import (
     ATTR_SOURCE_ENTITY,
     ATTR_SPACE,
     ATTR_TOTAL_ESTIMATED,
+    CONF_SPACES,
     DOMAIN,
+    ENTITY_KIND_LINK_CONTACT,
+    ENTITY_KIND_LINK_LOCK,
+    ENTITY_KIND_LINK_MOTION,
+    ENTITY_KIND_SPACE,
     EVENT_PRESENCE_GRAPH_UPDATE,
+    LINK_EVENT_DEBOUNCE,
 )
-from .graph_engine import GraphEngine, GraphEvent
+from .graph_engine import GraphEngine, GraphEvent, GraphUpdate
 from .model import Link, PresenceState, Space
+from .utils import json_dumps
 
 _LOGGER = logging.getLogger(__name__)
+_UNSEEN = object()
+# Doors and locks gate traversals and must not wait for the coalescing window.
+_IMMEDIATE_KINDS = frozenset((ENTITY_KIND_LINK_CONTACT, ENTITY_KIND_LINK_LOCK))
 
 
 class PresenceGraphCoordinator(DataUpdateCoordinator[PresenceState]):
@@ -32,18 +45,28 @@ class PresenceGraphCoordinator(DataUpdateCoordinator[PresenceState]):
         super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=None)
         self.config_entry = config_entry
         self.engine = engine
+        self._loop_time = getattr(hass.loop, "time", time.monotonic)
         self._unsubscribers: list[CALLBACK_TYPE] = []
-        self._entity_map: dict[str, str] = {}
+        self._entity_kinds: dict[str, int] = {}
+        self._space_index: dict[str, int] = {}
+        self._last_state: dict[str, Any] = {}
+        self._pending: list[GraphEvent] = []
+        self._flush_unsub: CALLBACK_TYPE | None = None
+        self.adjacency: dict[str, tuple[str, ...]] = {}
+        self.updated_at_iso: str | None = None
+        self.occupied_spaces: list[str] = []
+        self._space_counts_json: str | None = None
 
     async def async_setup(self, spaces: list[Space], links: list[Link]) -> None:
         """Initialise listeners according to the configured model."""
 
         await self.async_refresh()
         self._build_entity_index(spaces, links)
+        self._build_adjacency(spaces, links)
         self._unsubscribe()
         self._unsubscribers.append(
             async_track_state_change_event(
-                self.hass, list(self._entity_map), self._handle_state_event
+                self.hass, list(self._entity_kinds), self._handle_state_event
             )
         )
 
@@ -55,14 +78,39 @@ class PresenceGraphCoordinator(DataUpdateCoordinator[PresenceState]):
             len(spaces),
             len(links),
         )
+        self._cancel_pending()
         self.engine.set_model(spaces, links)
         await self.async_setup(spaces, links)
 
     async def async_unload(self) -> None:
         self._unsubscribe()
+        self._cancel_pending()
 
     async def _async_update_data(self) -> PresenceState:
-        return self.engine.current_state()
+        state = self.engine.current_state()
+        self._snapshot(state)
+        return state
+
+    @callback
+    def async_set_updated_data(self, data: PresenceState) -> None:
+        self._snapshot(data)
+        super().async_set_updated_data(data)
+
+    def _snapshot(self, state: PresenceState) -> None:
+        """Derive the values every sensor reads once per published update."""
+
+        self.updated_at_iso = datetime.now(UTC).isoformat()
+        self.occupied_spaces = [space_id for space_id, active in state.occupied.items() if active]
+        self._space_counts_json = None
+
+    @property
+    def space_counts_json(self) -> str:
+        """Compact JSON of the published space counts, serialised on first read."""
+
+        if self._space_counts_json is None:
+            counts = self.data.space_counts if self.data else {}
+            self._space_counts_json = json_dumps(counts)
+        return self._space_counts_json
 
     # ------------------------------------------------------------------
     def _unsubscribe(self) -> None:
@@ -70,26 +118,51 @@ class PresenceGraphCoordinator(DataUpdateCoordinator[PresenceState]):
             unsub()
         self._unsubscribers.clear()
 
+    def _cancel_pending(self) -> None:
+        if self._flush_unsub is not None:
+            self._flush_unsub()
+            self._flush_unsub = None
+        self._pending.clear()
+
     def _build_entity_index(self, spaces: list[Space], links: list[Link]) -> None:
-        self._entity_map.clear()
+        kinds = self._entity_kinds
+        kinds.clear()
+        self._last_state.clear()
+        self._space_index = {space.id: index for index, space in enumerate(spaces)}
         for space in spaces:
-            for entity in space.motion_entities + space.presence_entities:
-                self._entity_map[entity] = space.id
+            for entity in chain(space.motion_entities, space.presence_entities):
+                kinds[entity] = ENTITY_KIND_SPACE
         for link in links:
-            for entity in link.motion_entities + link.contact_entities + link.lock_entities:
-                self._entity_map[entity] = link.id
+            for entity in link.motion_entities:
+                kinds[entity] = ENTITY_KIND_LINK_MOTION
+            for entity in link.contact_entities:
+                kinds[entity] = ENTITY_KIND_LINK_CONTACT
+            for entity in link.lock_entities:
+                kinds[entity] = ENTITY_KIND_LINK_LOCK
 
+    def _build_adjacency(self, spaces: list[Space], links: list[Link]) -> None:
+        adjacency: dict[str, list[str]] = {space.id: [] for space in spaces}
+        for link in links:
+            adjacency.setdefault(link.from_space, []).append(link.to_space)
+            adjacency.setdefault(link.to_space, []).append(link.from_space)
+        self.adjacency = {space_id: tuple(linked) for space_id, linked in adjacency.items()}
+
+    @callback
     def _handle_state_event(self, event: Event) -> None:
         entity_id: str = event.data.get("entity_id")
         new_state: State | None = event.data.get("new_state")
         old_state: State | None = event.data.get("old_state")
-        if entity_id not in self._entity_map or new_state is None:
+        kind = self._entity_kinds.get(entity_id)
+        if kind is None or new_state is None:
+            return
+        # Attribute-only updates and replayed events carry no new information.
+        if old_state is not None and old_state.state == new_state.state:
             return
-        loop_time = getattr(self.hass.loop, "time", None)
+        if self._last_state.get(entity_id, _UNSEEN) == new_state.state:
+            return
+        self._last_state[entity_id] = new_state.state
         timestamp = (
-            new_state.last_changed.timestamp()
-            if new_state.last_changed
-            else (loop_time() if loop_time else 0.0)
+            new_state.last_changed.timestamp() if new_state.last_changed else self._loop_time()
         )
         duration: float | None = None
         if old_state is not None and new_state.last_changed and old_state.last_changed:
@@ -102,11 +175,56 @@ class PresenceGraphCoordinator(DataUpdateCoordinator[PresenceState]):
             timestamp=timestamp,
             duration=duration,
         )
-        update = self.engine.process_event(graph_event)
+        if kind in _IMMEDIATE_KINDS:
+            self._pending.append(graph_event)
+            self._process_pending()
+        elif self._flush_unsub is None:
+            # Leading edge: handle the first event of a burst right away and
+            # coalesce the ones that follow until the window closes.
+            self._process_events([graph_event])
+            self._flush_unsub = async_call_later(
+                self.hass, LINK_EVENT_DEBOUNCE, self._async_flush_window
+            )
+        else:
+            self._pending.append(graph_event)
+
+    @callback
+    def _async_flush_window(self, _now: datetime) -> None:
+        self._flush_unsub = None
+        self._process_pending()
+
+    def _process_pending(self) -> None:
+        if not self._pending:
+            return
+        events = self._pending
+        self._pending = []
+        self._process_events(events)
+
+    def _process_events(self, events: list[GraphEvent]) -> None:
+        """Feed events to the engine and publish a single update for the batch."""
+
+        changed: dict[str, None] = {}
+        update: GraphUpdate | None = None
+        # Attribute the batch to the last event that actually changed something.
+        source: GraphUpdate | None = None
+        source_entity_id = ""
+        for graph_event in events:
+            update = self.engine.process_event(graph_event)
+            if update.changed:
+                changed.update(dict.fromkeys(update.changed))
+                source = update
+                source_entity_id = graph_event.entity_id
+        if update is None:
+            return
         self.async_set_updated_data(update.state)
-        self._fire_update_event(update, entity_id)
+        if source is not None:
+            self._fire_update_event(
+                source._replace(changed=list(changed), state=update.state), source_entity_id
+            )
 
-    def _fire_update_event(self, update: Any, entity_id: str) -> None:
+    def _fire_update_event(self, update: GraphUpdate, entity_id: str) -> None:
+        if not update.changed:
+            return
         state = update.state
         payload = {
             ATTR_CHANGED: update.changed,
@@ -122,19 +240,28 @@ class PresenceGraphCoordinator(DataUpdateCoordinator[PresenceState]):
         if space_id not in self.engine.space_ids():
             raise ValueError(f"Unknown space: {space_id}")
         options = dict(self.config_entry.options)
-        spaces_data = [dict(item) for item in options.get("spaces", [])]
-        for space in spaces_data:
-            if space["id"] == space_id:
-                space["include_in_total"] = include
-                break
-        options["spaces"] = spaces_data
+        spaces_data = list(
+            options.get(CONF_SPACES, self.config_entry.data.get(CONF_SPACES, []))
+        )
+        index = self._space_index.get(space_id)
+        if index is None or index >= len(spaces_data) or spaces_data[index]["id"] != space_id:
+            index = next(
+                (pos for pos, item in enumerate(spaces_data) if item["id"] == space_id), None
+            )
+        if index is not None:
+            spaces_data[index] = {**spaces_data[index], "include_in_total": include}
+        options[CONF_SPACES] = spaces_data
         await self.hass.config_entries.async_update_entry(self.config_entry, options=options)
+        # Events still waiting in the coalescing window happened before this change.
+        self._process_pending()
         self.engine.set_space_inclusion(space_id, include)
         self.async_set_updated_data(self.engine.current_state())
 
     async def async_force_space_state(
         self, space_id: str, occupied: bool, score: float | None = None
     ) -> None:
+        # Apply earlier queued events first so they cannot override the forced state.
+        self._process_pending()
         update = self.engine.force_space_state(space_id, occupied, score)
         self.async_set_updated_data(update.state)
         self._fire_update_event(update, "service.force_space_state")
@@ -1,10 +1,12 @@
 """Inference engine for the Presence Graph integration."""
 from __future__ import annotations
 
-from collections import deque
+import sys
 from collections.abc import Callable, Iterable
-from dataclasses import asdict, dataclass
-from typing import Any
+from dataclasses import asdict
+from itertools import chain
+from math import inf, nextafter
+from typing import Any, NamedTuple
 
 from .const import (
     ATTR_REASON_DECAY,
@@ -14,15 +16,19 @@ from .const import (
     DEFAULT_DECAY_THRESHOLD,
     DEFAULT_TIMEOUT,
     DEFAULT_TRAVERSAL_LATENCY,
+    ENTITY_KIND_LINK_CONTACT,
+    ENTITY_KIND_LINK_LOCK,
+    ENTITY_KIND_LINK_MOTION,
+    ENTITY_KIND_SPACE,
     LINK_EVENT_DEBOUNCE,
     MIN_EVENT_DURATION,
+    SCORE_PRECISION,
 )
 from .model import Link, PresenceState, Space
-from .utils import ensure_unique_ids, is_on_state, sorted_unique, state_is_locked
+from .utils import ensure_unique_ids, is_on_state, state_is_locked
 
 
-@dataclass(slots=True)
-class GraphEvent:
+class GraphEvent(NamedTuple):
     """Representation of an entity event forwarded to the engine."""
 
     entity_id: str
@@ -32,8 +38,7 @@ class GraphEvent:
     duration: float | None = None
 
 
-@dataclass(slots=True)
-class GraphUpdate:
+class GraphUpdate(NamedTuple):
     """Information returned after processing an event."""
 
     state: PresenceState
@@ -44,6 +49,15 @@ class GraphUpdate:
     link: str | None = None
 
 
+def _decay_deadline(score: float, last_ts: float, timeout: float) -> float:
+    """Return the first time a decay pass can lower ``score``."""
+
+    if score >= 1.0:
+        # A pass at the event instant itself is a no-op, so only later ones count.
+        return nextafter(last_ts, inf)
+    return last_ts + (1.0 - score) * timeout
+
+
 class GraphEngine:
     """Core inference engine operating on the presence graph."""
 
@@ -58,12 +72,31 @@ class GraphEngine:
         self._decay_threshold = decay_threshold
         self._spaces: dict[str, Space] = {}
         self._links: dict[str, Link] = {}
-        self._entity_index: dict[str, tuple[str, str]] = {}
+        self._entity_index: dict[str, tuple[int, int]] = {}
         self._adjacency: dict[str, set[str]] = {}
-        self._link_entities: dict[str, dict[str, set[str]]] = {}
-        self._locked_links: set[str] = set()
-        self._last_link_event: dict[str, float] = {}
+        self._space_index: dict[str, int] = {}
+        self._space_ids: tuple[str, ...] = ()
+        self._link_ids: tuple[str, ...] = ()
+        self._timeouts: list[float] = []
+        self._inv_timeouts: list[float] = []
+        self._include_mask: list[bool] = []
+        self._scores: list[float] = []
+        self._last_ts: list[float] = []
+        self._next_decay_at = float("inf")
+        self._neighbour_bits: tuple[int, ...] = ()
+        self._locked_links: list[bool] = []
+        self._last_link_event: list[float] = []
         self._last_reason: str = ATTR_REASON_DECAY
+        self._space_dicts: dict[str, dict[str, Any]] = {}
+        self._link_dicts: dict[str, dict[str, Any]] = {}
+        self._adjacency_lists: dict[str, list[str]] = {}
+        self._included_bits = 0
+        self._totals_dirty = False
+        self._cluster_count = 0
+        self._clusters_stale = False
+        self._idle_state: tuple[
+            dict[str, bool], dict[str, float], dict[str, float], dict[str, int]
+        ] = ({}, {}, {}, {})
         self._state = PresenceState(occupied={}, scores={}, total_estimated=0, last_event_ts={})
         self.set_model(spaces, links)
 
@@ -81,95 +114,134 @@ class GraphEngine:
         self._spaces = space_map
         self._links = link_map
         self._adjacency = {sid: set() for sid in space_map}
+        self._space_index = {space_id: index for index, space_id in enumerate(space_map)}
+        self._space_ids = tuple(space_map)
+        self._link_ids = tuple(link_map)
         self._entity_index.clear()
-        self._link_entities = {
-            link_id: {"motion": set(), "contact": set(), "lock": set()}
-            for link_id in link_map
-        }
 
-        for space in space_map.values():
-            for entity in sorted_unique(space.motion_entities + space.presence_entities):
-                self._entity_index[entity] = ("space", space.id)
+        # Entity ids are interned and mapped to (kind, index) so event dispatch
+        # compares small ints and indexes the per-space and per-link tables.
+        # Repeated ids simply store the same entry again, so no dedup is needed.
+        entity_index = self._entity_index
+        for space_index, space in enumerate(space_map.values()):
+            for entity in chain(space.motion_entities, space.presence_entities):
+                entity_index[sys.intern(entity)] = (ENTITY_KIND_SPACE, space_index)
 
-        for link in link_map.values():
+        for link_index, link in enumerate(link_map.values()):
             if link.from_space not in self._adjacency or link.to_space not in self._adjacency:
                 continue
             self._adjacency[link.from_space].add(link.to_space)
             self._adjacency[link.to_space].add(link.from_space)
-            for entity in sorted_unique(link.motion_entities):
-                self._entity_index[entity] = ("link_motion", link.id)
-                self._link_entities[link.id]["motion"].add(entity)
-            for entity in sorted_unique(link.contact_entities):
-                self._entity_index[entity] = ("link_contact", link.id)
-                self._link_entities[link.id]["contact"].add(entity)
-            for entity in sorted_unique(link.lock_entities):
-                self._entity_index[entity] = ("link_lock", link.id)
-                self._link_entities[link.id]["lock"].add(entity)
+            for entity in link.motion_entities:
+                entity_index[sys.intern(entity)] = (ENTITY_KIND_LINK_MOTION, link_index)
+            for entity in link.contact_entities:
+                entity_index[sys.intern(entity)] = (ENTITY_KIND_LINK_CONTACT, link_index)
+            for entity in link.lock_entities:
+                entity_index[sys.intern(entity)] = (ENTITY_KIND_LINK_LOCK, link_index)
+
+        self._timeouts = [float(space.timeout_s or DEFAULT_TIMEOUT) for space in space_map.values()]
+        self._inv_timeouts = [1.0 / timeout for timeout in self._timeouts]
+        self._include_mask = [space.include_in_total for space in space_map.values()]
+        # Bit i of a mask stands for space i, so cluster counting is plain int bit ops.
+        self._neighbour_bits = tuple(
+            sum(1 << self._space_index[neighbour] for neighbour in self._adjacency[space_id])
+            for space_id in space_map
+        )
+
+        # The model only changes here and through set_space_inclusion, so the
+        # diagnostic view is serialised once instead of on every describe().
+        self._space_dicts = {sid: asdict(space) for sid, space in space_map.items()}
+        self._link_dicts = {lid: asdict(link) for lid, link in link_map.items()}
+        self._adjacency_lists = {
+            sid: sorted(neighbours) for sid, neighbours in self._adjacency.items()
+        }
+
+        # Copying prebuilt idle dicts is cheaper than rehashing every id on reset.
+        self._idle_state = (
+            dict.fromkeys(space_map, False),
+            dict.fromkeys(space_map, 0.0),
+            dict.fromkeys(space_map, float("-inf")),
+            dict.fromkeys(space_map, 0),
+        )
 
         self.reset_state()
 
     def reset_state(self) -> None:
         """Reset the internal dynamic state."""
 
+        occupied, scores, last_event_ts, space_counts = self._idle_state
         self._state = PresenceState(
-            occupied=dict.fromkeys(self._spaces, False),
-            scores=dict.fromkeys(self._spaces, 0.0),
+            occupied=occupied.copy(),
+            scores=scores.copy(),
             total_estimated=0,
-            last_event_ts={space_id: float("-inf") for space_id in self._spaces},
-            space_counts=dict.fromkeys(self._spaces, 0),
+            last_event_ts=last_event_ts.copy(),
+            space_counts=space_counts.copy(),
         )
-        self._locked_links.clear()
-        self._last_link_event.clear()
+        # Dense per-index mirrors of the score bookkeeping; the dicts above are
+        # the public view and are written through whenever a value changes.
+        self._scores = [0.0] * len(self._spaces)
+        self._last_ts = [float("-inf")] * len(self._spaces)
+        self._next_decay_at = float("inf")
+        self._locked_links = [False] * len(self._links)
+        self._last_link_event = [float("-inf")] * len(self._links)
         self._last_reason = ATTR_REASON_DECAY
+        self._included_bits = 0
+        self._totals_dirty = False
+        self._cluster_count = 0
+        self._clusters_stale = False
 
     def current_state(self) -> PresenceState:
         """Return the current state snapshot."""
 
-        self._apply_decay(self._time_func())
+        now = self._time_func()
+        if now >= self._next_decay_at:
+            self._apply_decay(now)
         return self._state
 
     def process_event(self, event: GraphEvent) -> GraphUpdate:
         """Process an entity state event and return updated state."""
 
+        ts = event.timestamp
+        # Decay passes are skipped outright until a score can actually drop.
+        if ts >= self._next_decay_at:
+            self._apply_decay(ts)
         mapping = self._entity_index.get(event.entity_id)
         if mapping is None:
-            self._apply_decay(event.timestamp)
             return GraphUpdate(self._state, [], ATTR_REASON_DECAY)
 
-        event_type, target_id = mapping
-        ts = event.timestamp
+        kind, target = mapping
         changed: list[str] = []
-        self._apply_decay(ts)
 
         if event.duration is not None and event.duration < MIN_EVENT_DURATION:
             return GraphUpdate(self._state, [], ATTR_REASON_DECAY)
 
-        if event_type == "space":
+        if kind == ENTITY_KIND_SPACE:
             if is_on_state(event.new_state):
-                changed = self._activate_space(target_id, ts, event.entity_id)
+                changed = self._activate_space(target, ts)
                 reason = ATTR_REASON_SENSOR
             else:
                 reason = ATTR_REASON_DECAY
-        elif event_type == "link_lock":
-            reason = self._handle_link_lock(target_id, event)
+        elif kind == ENTITY_KIND_LINK_LOCK:
+            reason = self._handle_link_lock(target, event)
         else:
-            changed = self._handle_link_activity(target_id, ts, event.entity_id)
+            changed = self._handle_link_activity(target, ts)
             reason = ATTR_REASON_LINK
 
+        # Decay and pending arrivals can move the total even when this event
+        # changed nothing, so recompute whenever the bookkeeping is dirty.
+        if self._totals_dirty:
+            self._recalculate_totals()
         if changed:
             self._last_reason = reason
-            self._recalculate_totals()
         else:
-            self._recalculate_totals()
             reason = self._last_reason
 
+        if kind == ENTITY_KIND_SPACE:
+            return GraphUpdate(
+                self._state, changed, reason, event.entity_id, space=self._space_ids[target]
+            )
         return GraphUpdate(
-            self._state,
-            changed,
-            reason,
-            event.entity_id,
-            space=mapping[1] if event_type == "space" else None,
-            link=target_id if event_type != "space" else None,
+            self._state, changed, reason, event.entity_id, link=self._link_ids[target]
         )
 
     def force_space_state(
@@ -182,151 +254,191 @@ class GraphEngine:
     ) -> GraphUpdate:
         """Force the state of a space for debugging purposes."""
 
-        if space_id not in self._spaces:
+        index = self._space_index.get(space_id)
+        if index is None:
             return GraphUpdate(self._state, [], reason)
         ts = self._time_func()
         score_to_apply = max(
             0.0, min(1.0, score if score is not None else (1.0 if occupied else 0.0))
         )
-        self._state.scores[space_id] = score_to_apply
-        self._state.occupied[space_id] = (
-            occupied if occupied else score_to_apply > self._decay_threshold
-        )
+        self._set_score(index, score_to_apply)
+        self._set_occupied(index, occupied if occupied else score_to_apply > self._decay_threshold)
         if occupied:
-            self._state.last_event_ts[space_id] = ts
+            self._set_last_event(index, ts)
+        self._schedule_decay(index)
         changed = [space_id]
         self._recalculate_totals()
         return GraphUpdate(self._state, changed, reason, space=space_id)
 
     def set_space_inclusion(self, space_id: str, include: bool) -> None:
-        if space_id in self._spaces:
+        index = self._space_index.get(space_id)
+        if index is not None:
             self._spaces[space_id].include_in_total = include
+            self._include_mask[index] = include
+            self._space_dicts[space_id]["include_in_total"] = include
+            self._track_included(index, include and self._state.occupied[space_id])
             self._recalculate_totals()
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _activate_space(self, space_id: str, ts: float, entity_id: str) -> list[str]:
-        if space_id not in self._spaces:
-            return []
-        self._state.scores[space_id] = 1.0
-        self._state.occupied[space_id] = True
-        self._state.last_event_ts[space_id] = ts
-        self._state.space_counts[space_id] = 1
-        return [space_id]
-
-    def _handle_link_lock(self, link_id: str, event: GraphEvent) -> str:
-        locked = state_is_locked(event.new_state)
-        if locked:
-            self._locked_links.add(link_id)
-        else:
-            self._locked_links.discard(link_id)
+    def _activate_space(self, index: int, ts: float) -> list[str]:
+        self._set_score(index, 1.0)
+        self._set_last_event(index, ts)
+        self._schedule_decay(index)
+        self._set_occupied(index, True)
+        return [self._space_ids[index]]
+
+    def _handle_link_lock(self, link_index: int, event: GraphEvent) -> str:
+        self._locked_links[link_index] = state_is_locked(event.new_state)
         return ATTR_REASON_LINK
 
-    def _handle_link_activity(self, link_id: str, ts: float, entity_id: str) -> list[str]:
-        if link_id not in self._links:
-            return []
-        if link_id in self._locked_links:
+    def _handle_link_activity(self, link_index: int, ts: float) -> list[str]:
+        if self._locked_links[link_index]:
             return []
-        last_event_ts = self._last_link_event.get(link_id)
-        if last_event_ts is not None and ts - last_event_ts < LINK_EVENT_DEBOUNCE:
+        # Links that never fired sit at -inf and are never within the debounce.
+        if ts - self._last_link_event[link_index] < LINK_EVENT_DEBOUNCE:
             return []
-        self._last_link_event[link_id] = ts
+        self._last_link_event[link_index] = ts
 
-        link = self._links[link_id]
+        link = self._links[self._link_ids[link_index]]
         latency = link.traversal_latency_s or DEFAULT_TRAVERSAL_LATENCY
-        candidates: list[tuple[str, str]] = [
-            (link.from_space, link.to_space),
-            (link.to_space, link.from_space),
-        ]
+        from_index = self._space_index[link.from_space]
+        to_index = self._space_index[link.to_space]
+        last_ts = self._last_ts
         changed: list[str] = []
-        for source, target in candidates:
-            last_activation = self._state.last_event_ts.get(source, 0.0)
-            if last_activation > float("-inf") and ts - last_activation <= latency:
-                boost = self._compute_boost(target, ts)
-                if boost:
-                    changed.append(target)
-        return sorted_unique(changed)
-
-    def _compute_boost(self, space_id: str, ts: float) -> bool:
-        if space_id not in self._spaces:
-            return False
-        prev_score = self._state.scores.get(space_id, 0.0)
+        # Spaces never activated sit at -inf, which is never within the latency.
+        if ts - last_ts[from_index] <= latency and self._compute_boost(to_index, ts):
+            changed.append(link.to_space)
+        # Read only now: the boost above may have just refreshed this endpoint.
+        if ts - last_ts[to_index] <= latency and self._compute_boost(from_index, ts):
+            changed.append(link.from_space)
+        return changed
+
+    def _compute_boost(self, index: int, ts: float) -> bool:
+        prev_score = self._scores[index]
         new_score = max(prev_score, 0.6)
         if new_score <= prev_score + 1e-6:
             return False
-        self._state.scores[space_id] = min(1.0, new_score)
-        self._state.last_event_ts[space_id] = ts
-        self._state.occupied[space_id] = self._state.scores[space_id] > self._decay_threshold
-        if self._state.occupied[space_id]:
-            self._state.space_counts[space_id] = 1
+        new_score = min(1.0, new_score)
+        self._set_score(index, new_score)
+        self._set_last_event(index, ts)
+        self._schedule_decay(index)
+        self._set_occupied(index, new_score > self._decay_threshold)
         return True
 
     def _apply_decay(self, now: float) -> None:
-        for space_id, space in self._spaces.items():
-            last_ts = self._state.last_event_ts.get(space_id, float("-inf"))
-            timeout = space.timeout_s or DEFAULT_TIMEOUT
-            elapsed = max(0.0, now - last_ts)
+        """Decay every space to ``now``; callers skip this before ``_next_decay_at``."""
+
+        threshold = self._decay_threshold
+        next_decay_at = float("inf")
+        for index, (score, last_ts, timeout, inv_timeout) in enumerate(
+            zip(self._scores, self._last_ts, self._timeouts, self._inv_timeouts, strict=True)
+        ):
+            if score <= 0.0:
+                continue
+            elapsed = now - last_ts
             if elapsed >= timeout:
                 new_score = 0.0
+            elif elapsed <= 0.0:
+                # A fresh event decays to 1.0, which can never lower a score.
+                new_score = score
             else:
-                new_score = max(0.0, 1.0 - elapsed / timeout)
-            if new_score < self._state.scores.get(space_id, 0.0):
-                self._state.scores[space_id] = new_score
-                self._state.occupied[space_id] = new_score > self._decay_threshold
-                if not self._state.occupied[space_id]:
-                    self._state.space_counts[space_id] = 0
+                new_score = 1.0 - elapsed * inv_timeout
+            if new_score < score:
+                self._set_score(index, new_score)
+                self._set_occupied(index, new_score > threshold)
+                score = new_score
+            if score > 0.0:
+                next_decay_at = min(next_decay_at, _decay_deadline(score, last_ts, timeout))
+        # Repeating a pass at the same instant recomputes the same scores, so only
+        # spaces rewritten since (which reschedule themselves) can pull this back.
+        self._next_decay_at = max(next_decay_at, nextafter(now, inf))
+
+    def _set_score(self, index: int, score: float) -> None:
+        """Store the exact score for inference and its rounded form in the state."""
+
+        self._scores[index] = score
+        self._state.scores[self._space_ids[index]] = round(score, SCORE_PRECISION)
+
+    def _set_last_event(self, index: int, ts: float) -> None:
+        self._last_ts[index] = ts
+        self._state.last_event_ts[self._space_ids[index]] = ts
+
+    def _schedule_decay(self, index: int) -> None:
+        """Pull the next decay pass forward to when this space could first lose score.
+
+        Before ``last_ts + (1 - score) * timeout`` the linear decay is still at
+        least the current score, so passes before then cannot change it. Call this
+        once both the score and ``last_ts`` of the space have been written.
+        """
+
+        score = self._scores[index]
+        if score > 0.0:
+            deadline = _decay_deadline(score, self._last_ts[index], self._timeouts[index])
+            if deadline < self._next_decay_at:
+                self._next_decay_at = deadline
+
+    def _set_occupied(self, index: int, occupied: bool) -> None:
+        """Record the occupancy of a space and keep the totals bookkeeping in sync."""
+
+        space_id = self._space_ids[index]
+        self._state.occupied[space_id] = occupied
+        self._state.space_counts[space_id] = 1 if occupied else 0
+        self._track_included(index, occupied and self._include_mask[index])
+
+    def _track_included(self, index: int, included: bool) -> None:
+        bit = 1 << index
+        members = self._included_bits
+        if included:
+            if members & bit:
+                return
+            self._included_bits = members | bit
+        else:
+            if not members & bit:
+                return
+            self._included_bits = members & ~bit
+        self._clusters_stale = True
+        self._totals_dirty = True
 
     def _recalculate_totals(self) -> None:
-        occupied_spaces = [sid for sid, occ in self._state.occupied.items() if occ]
-        included = [sid for sid in occupied_spaces if self._spaces[sid].include_in_total]
-        space_counts = {sid: (1 if sid in occupied_spaces else 0) for sid in self._spaces}
-        self._state.space_counts = space_counts
-
-        if not occupied_spaces:
-            self._state.total_estimated = 0
+        if not self._totals_dirty:
             return
-
-        if not included:
+        if not self._included_bits:
             self._state.total_estimated = 0
+            self._totals_dirty = False
             return
 
-        clusters = self._count_clusters(included)
-        estimated = max(clusters, 1)
+        if self._clusters_stale:
+            self._cluster_count = _count_components(self._included_bits, self._neighbour_bits)
+            self._clusters_stale = False
+        clusters = self._cluster_count
+        estimated = clusters
         previous = self._state.total_estimated
         if estimated > previous + 1:
             estimated = previous + 1
         self._state.total_estimated = estimated
-
-    def _count_clusters(self, spaces: list[str]) -> int:
-        if not spaces:
-            return 0
-        remaining = set(spaces)
-        visited: set[str] = set()
-        clusters = 0
-        while remaining:
-            current = remaining.pop()
-            clusters += 1
-            queue: deque[str] = deque([current])
-            visited.add(current)
-            while queue:
-                node = queue.popleft()
-                for neighbour in self._adjacency.get(node, set()):
-                    if neighbour in visited or neighbour not in remaining:
-                        continue
-                    visited.add(neighbour)
-                    remaining.discard(neighbour)
-                    queue.append(neighbour)
-        return clusters
+        # Arrivals are counted one per recalculation; stay dirty until caught up.
+        self._totals_dirty = estimated != clusters
 
     def describe(self) -> dict[str, Any]:
-        """Return a diagnostic description of the current graph."""
+        """Return a diagnostic description of the current graph.
+
+        Each space, link and adjacency entry is a fresh shallow copy of the cached
+        view, so callers may redact keys in place. Nested entity lists and the
+        ``state`` mappings are shared with the engine and must be treated as
+        read-only.
+        """
 
         return {
-            "spaces": {sid: asdict(space) for sid, space in self._spaces.items()},
-            "links": {lid: asdict(link) for lid, link in self._links.items()},
-            "locked_links": sorted(self._locked_links),
-            "adjacency": {sid: sorted(neighbours) for sid, neighbours in self._adjacency.items()},
+            "spaces": {sid: dict(space) for sid, space in self._space_dicts.items()},
+            "links": {lid: dict(link) for lid, link in self._link_dicts.items()},
+            "adjacency": {sid: list(linked) for sid, linked in self._adjacency_lists.items()},
+            "locked_links": sorted(
+                link_id
+                for link_id, locked in zip(self._link_ids, self._locked_links, strict=True)
+                if locked
+            ),
             "state": self._state.as_dict(),
         }
 
@@ -335,3 +447,24 @@ class GraphEngine:
 
     def link_ids(self) -> list[str]:
         return list(self._links)
+
+
+def _count_components(members: int, neighbour_bits: tuple[int, ...]) -> int:
+    """Count the connected components among the spaces whose bits are set in ``members``."""
+
+    components = 0
+    remaining = members
+    while remaining:
+        frontier = remaining & -remaining
+        component = frontier
+        while frontier:
+            reach = 0
+            while frontier:
+                lowest = frontier & -frontier
+                reach |= neighbour_bits[lowest.bit_length() - 1]
+                frontier ^= lowest
+            frontier = reach & remaining & ~component
+            component |= frontier
+        remaining &= ~component
+        components += 1
+    return components
@@ -42,7 +42,11 @@ class PresenceState:
     space_counts: dict[str, int] = field(default_factory=dict)
 
     def as_dict(self) -> dict[str, Any]:
-        """Return a serialisable representation."""
+        """Return a serialisable representation.
+
+        The mappings are the live dicts kept current by the engine rather than
+        copies, so this is cheap to call but the result must not be mutated.
+        """
 
         return {
             "occupied": self.occupied,
@@ -1,9 +1,6 @@
 """Sensors exposed by the Presence Graph integration."""
 from __future__ import annotations
 
-import json
-from datetime import datetime
-
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
@@ -57,12 +54,11 @@ class PresenceGraphTotalSensor(CoordinatorEntity[PresenceGraphCoordinator], Sens
         state = self.coordinator.data
         if not state:
             return {}
-        occupied = [space_id for space_id, active in state.occupied.items() if active]
         return {
             ATTR_TOTAL_ESTIMATED: state.total_estimated,
             ATTR_SPACE_COUNTS: state.space_counts,
-            ATTR_OCCUPIED_SPACES: occupied,
-            ATTR_UPDATED_AT: datetime.utcnow().isoformat(),
+            ATTR_OCCUPIED_SPACES: self.coordinator.occupied_spaces,
+            ATTR_UPDATED_AT: self.coordinator.updated_at_iso,
             ATTR_METHOD: UPDATE_METHOD,
         }
 
@@ -83,17 +79,16 @@ class PresenceGraphSpaceCountSensor(CoordinatorEntity[PresenceGraphCoordinator],
             return "-"
         if not state.space_counts:
             return "-"
-        return json.dumps(state.space_counts)
+        return self.coordinator.space_counts_json
 
     @property
     def extra_state_attributes(self) -> dict[str, object]:
         state = self.coordinator.data
         if not state:
             return {}
-        occupied = [space_id for space_id, active in state.occupied.items() if active]
         return {
             ATTR_SPACE_COUNTS: state.space_counts,
-            ATTR_OCCUPIED_SPACES: occupied,
-            ATTR_UPDATED_AT: datetime.utcnow().isoformat(),
+            ATTR_OCCUPIED_SPACES: self.coordinator.occupied_spaces,
+            ATTR_UPDATED_AT: self.coordinator.updated_at_iso,
             ATTR_METHOD: UPDATE_METHOD,
         }
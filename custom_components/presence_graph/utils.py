@@ -1,26 +1,40 @@
 """Utility helpers for Presence Graph."""
 from __future__ import annotations
 
+import json
+import re
 from collections.abc import Iterable
+from functools import lru_cache
 from typing import Any
 
 import voluptuous as vol
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+_SLUG_SEPARATORS = re.compile(r"[\W_]+")
+_NUMBER_TYPES = (int, float)
+_TRUTHY_STATES = frozenset(("on", "open", "true", "locked", "home"))
+_ACTIVE_STATES = frozenset(("on", "open", "true", "home", "locked", "unlocked"))
+_LOCKED_STATES = frozenset(("on", "locked", "true"))
+
 
 def slugify(value: str) -> str:
     """Return a simple slugified representation."""
 
-    normalized = "".join(ch if ch.isalnum() else "_" for ch in value.lower())
-    while "__" in normalized:
-        normalized = normalized.replace("__", "_")
-    return normalized.strip("_")
+    return _SLUG_SEPARATORS.sub("_", value.lower()).strip("_")
 
 
 def ensure_unique_ids(items: Iterable[str]) -> None:
     """Validate that the iterable contains unique identifiers."""
 
+    values = list(items)
+    if len(set(values)) == len(values):
+        return
     seen: set[str] = set()
-    for item in items:
+    for item in values:
         if item in seen:
             raise vol.Invalid(f"Duplicate identifier: {item}")
         seen.add(item)
@@ -31,10 +45,10 @@ def as_bool(value: Any) -> bool:
 
     if isinstance(value, bool):
         return value
-    if isinstance(value, int | float):
+    if isinstance(value, _NUMBER_TYPES):
         return value != 0
     if isinstance(value, str):
-        return value.lower() in {"on", "open", "true", "locked", "home"}
+        return value.lower() in _TRUTHY_STATES
     return False
 
 
@@ -43,11 +57,10 @@ def is_on_state(value: Any) -> bool:
 
     if isinstance(value, bool):
         return value
-    if isinstance(value, int | float):
+    if isinstance(value, _NUMBER_TYPES):
         return value > 0
     if isinstance(value, str):
-        lowered = value.lower()
-        return lowered in {"on", "open", "true", "home", "locked", "unlocked"}
+        return value.lower() in _ACTIVE_STATES
     return False
 
 
@@ -57,7 +70,7 @@ def state_is_locked(value: Any) -> bool:
     if isinstance(value, bool):
         return value
     if isinstance(value, str):
-        return value.lower() in {"on", "locked", "true"}
+        return value.lower() in _LOCKED_STATES
     return False
 
 
@@ -66,7 +79,12 @@ def human_readable_duration(seconds: float) -> str:
 
     if seconds < 60:
         return f"{seconds:.0f}s"
-    minutes, remaining = divmod(int(seconds), 60)
+    return _format_whole_seconds(int(seconds))
+
+
+@lru_cache(maxsize=4096)
+def _format_whole_seconds(seconds: int) -> str:
+    minutes, remaining = divmod(seconds, 60)
     if minutes < 60:
         return f"{minutes}m{remaining:02d}s"
     hours, minutes = divmod(minutes, 60)
@@ -74,12 +92,27 @@ def human_readable_duration(seconds: float) -> str:
 
 
 def sorted_unique(items: Iterable[str]) -> list[str]:
-    """Return sorted unique values preserving order of first appearance."""
+    """Return unique values preserving order of first appearance.
 
-    seen: set[str] = set()
-    result: list[str] = []
-    for item in items:
-        if item not in seen:
-            seen.add(item)
-            result.append(item)
-    return result
+    Despite its name, the helper does not sort: callers rely on the original order.
+    """
+
+    return list(dict.fromkeys(items))
+
+
+def json_loads(payload: str) -> Any:
+    """Decode a JSON document, raising ValueError on malformed input."""
+
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def json_dumps(value: Any, *, indent: bool = False) -> str:
+    """Encode a value as JSON, optionally indented for user-facing forms."""
+
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
@@ -1,12 +1,12 @@
 """Common test fixtures and Home Assistant stubs."""
 from __future__ import annotations
 
+import copy
 import pathlib
 import sys
 import types
-from collections.abc import Callable
-from dataclasses import dataclass
-from datetime import datetime
+from collections.abc import Callable, Coroutine, Mapping
+from datetime import UTC, datetime
 from typing import Any
 
 import pytest
@@ -27,22 +27,8 @@ def _ensure_module(name: str) -> types.ModuleType:
 # ---------------------------------------------------------------------------
 # Minimal Home Assistant stubs
 # ---------------------------------------------------------------------------
-ha = _ensure_module("homeassistant")
-core = _ensure_module("homeassistant.core")
-config_entries = _ensure_module("homeassistant.config_entries")
-helpers = _ensure_module("homeassistant.helpers")
-helpers.__path__ = []  # mark as package
-helpers_event = types.ModuleType("homeassistant.helpers.event")
-helpers_update = types.ModuleType("homeassistant.helpers.update_coordinator")
-helpers_typing = types.ModuleType("homeassistant.helpers.typing")
-components = _ensure_module("homeassistant.components")
-components.__path__ = []
-binary_sensor_module = types.ModuleType("homeassistant.components.binary_sensor")
-sensor_module = types.ModuleType("homeassistant.components.sensor")
-switch_module = types.ModuleType("homeassistant.components.switch")
 
 # Voluptuous stub -----------------------------------------------------------
-voluptuous = types.ModuleType("voluptuous")
 
 
 class Invalid(Exception):
@@ -89,13 +75,6 @@ class Schema:
         return value
 
 
-voluptuous.Invalid = Invalid
-voluptuous.Schema = Schema
-voluptuous.Required = Required
-voluptuous.Optional = Optional
-sys.modules["voluptuous"] = voluptuous
-
-
 def callback(func: Callable) -> Callable:
     return func
 
@@ -105,10 +84,14 @@ class ServiceCall:
         self.data = data or {}
 
 
+# Fixed default for State.last_changed; tests that care about timing pass their own.
+_EPOCH = datetime(2020, 1, 1, tzinfo=UTC)
+
+
 class State:
     def __init__(self, state: Any, last_changed: datetime | None = None) -> None:
         self.state = state
-        self.last_changed = last_changed or datetime.utcnow()
+        self.last_changed = last_changed or _EPOCH
 
 
 class Event:
@@ -126,22 +109,27 @@ class EventBus:
 
 class ServiceRegistry:
     def __init__(self) -> None:
-        self._services: set[tuple[str, str]] = set()
+        self._services: dict[str, dict[str, Callable[..., Any]]] = {}
 
     def has_service(self, domain: str, service: str) -> bool:
-        return (domain, service) in self._services
+        return service in self._services.get(domain, ())
 
     def async_register(self, domain: str, service: str, handler: Callable[..., Any]) -> None:
-        self._services.add((domain, service))
+        self._services.setdefault(domain, {})[service] = handler
+
+    async def async_call(
+        self, domain: str, service: str, service_data: dict[str, Any] | None = None
+    ) -> None:
+        await self._services[domain][service](ServiceCall(service_data))
 
 
 class ConfigEntriesManager:
     def __init__(self, hass: HomeAssistant) -> None:
         self._hass = hass
-        self._entries: list[ConfigEntry] = []
+        self._entries: dict[str, list[ConfigEntry]] = {}
 
     def async_entries(self, domain: str) -> list[ConfigEntry]:
-        return [entry for entry in self._entries if entry.domain == domain]
+        return list(self._entries.get(domain, ()))
 
     async def async_forward_entry_setups(self, entry: ConfigEntry, platforms: list[str]) -> None:
         entry._forwarded = list(platforms)
@@ -153,7 +141,7 @@ class ConfigEntriesManager:
         entry.options = options
 
     def add_entry(self, entry: ConfigEntry) -> None:
-        self._entries.append(entry)
+        self._entries.setdefault(entry.domain, []).append(entry)
 
 
 class HomeAssistant:
@@ -168,17 +156,31 @@ class HomeAssistant:
         return "<HomeAssistantStub>"
 
 
-@dataclass
 class ConfigEntry:
-    data: dict[str, Any]
-    options: dict[str, Any] | None = None
-    title: str = "Presence Graph"
-    domain: str = "presence_graph"
-    entry_id: str = "test-entry"
-
-    def __post_init__(self) -> None:
-        if self.options is None:
-            self.options = {}
+    __slots__ = (
+        "_forwarded",
+        "_on_unload",
+        "_update_listeners",
+        "data",
+        "domain",
+        "entry_id",
+        "options",
+        "title",
+    )
+
+    def __init__(
+        self,
+        data: dict[str, Any],
+        options: dict[str, Any] | None = None,
+        title: str = "Presence Graph",
+        domain: str = "presence_graph",
+        entry_id: str = "test-entry",
+    ) -> None:
+        self.data = data
+        self.options = options if options is not None else {}
+        self.title = title
+        self.domain = domain
+        self.entry_id = entry_id
         self._update_listeners: list[Callable[[HomeAssistant, ConfigEntry], Any]] = []
         self._on_unload: list[Callable[[], Any]] = []
 
@@ -196,10 +198,11 @@ class FlowResult(dict):
     pass
 
 
-class ConfigFlow:
-    def __init_subclass__(cls, **kwargs: Any) -> None:  # type: ignore[override]
-        cls.domain = kwargs.pop("domain", getattr(cls, "domain", None))
-        super().__init_subclass__()
+_EMPTY: Mapping[str, str] = types.MappingProxyType({})
+
+
+class _FormBase:
+    """Form and entry helpers shared by the config and options flow stubs."""
 
     async def async_show_form(
         self,
@@ -210,39 +213,24 @@ class ConfigFlow:
         description_placeholders: dict[str, str] | None = None,
     ) -> FlowResult:
         return FlowResult(
-            {
-                "type": "form",
-                "step_id": step_id,
-                "errors": errors or {},
-                "description_placeholders": description_placeholders or {},
-            }
+            type="form",
+            step_id=step_id,
+            errors=errors or _EMPTY,
+            description_placeholders=description_placeholders or _EMPTY,
         )
 
     async def async_create_entry(self, *, title: str, data: dict[str, Any]) -> FlowResult:
-        return FlowResult({"type": "create_entry", "title": title, "data": data})
+        return FlowResult(type="create_entry", title=title, data=data)
 
 
-class OptionsFlow:
-    async def async_show_form(
-        self,
-        *,
-        step_id: str,
-        data_schema: Any,
-        errors: dict[str, str] | None = None,
-        description_placeholders: dict[str, str] | None = None,
-    ) -> FlowResult:
-        return FlowResult(
-            {
-                "type": "form",
-                "step_id": step_id,
-                "errors": errors or {},
-                "description_placeholders": description_placeholders or {},
-            }
-        )
+class ConfigFlow(_FormBase):
+    def __init_subclass__(cls, **kwargs: Any) -> None:  # type: ignore[override]
+        cls.domain = kwargs.pop("domain", getattr(cls, "domain", None))
+        super().__init_subclass__()
 
-    async def async_create_entry(self, *, title: str, data: dict[str, Any]) -> FlowResult:
-        return FlowResult({"type": "create_entry", "title": title, "data": data})
 
+class OptionsFlow(_FormBase):
+    pass
 
 
 class DataUpdateCoordinator:
@@ -305,45 +293,100 @@ class SwitchEntity:
     pass
 
 
-helpers_event.async_track_state_change_event = lambda hass, entity_ids, action: (lambda: None)
-helpers_update.DataUpdateCoordinator = DataUpdateCoordinator
-helpers_update.CoordinatorEntity = CoordinatorEntity
-sensor_module.SensorEntity = SensorEntity
-sensor_module.SensorStateClass = SensorStateClass
-binary_sensor_module.BinarySensorEntity = BinarySensorEntity
-binary_sensor_module.BinarySensorDeviceClass = BinarySensorDeviceClass
-switch_module.SwitchEntity = SwitchEntity
-
-ha.core = core
-ha.config_entries = config_entries
-ha.helpers = helpers
-ha.components = components
-
-core.callback = callback
-core.HomeAssistant = HomeAssistant
-core.ServiceCall = ServiceCall
-core.State = State
-core.Event = Event
-core.CALLBACK_TYPE = Callable[..., None]
-
-config_entries.ConfigFlow = ConfigFlow
-config_entries.OptionsFlow = OptionsFlow
-config_entries.ConfigEntry = ConfigEntry
-config_entries.FlowResult = FlowResult
-
-helpers.update_coordinator = helpers_update
-helpers.event = helpers_event
-helpers.typing = helpers_typing
-components.binary_sensor = binary_sensor_module
-components.sensor = sensor_module
-components.switch = switch_module
-
-sys.modules["homeassistant.helpers.event"] = helpers_event
-sys.modules["homeassistant.helpers.update_coordinator"] = helpers_update
-sys.modules["homeassistant.helpers.typing"] = helpers_typing
-sys.modules["homeassistant.components.binary_sensor"] = binary_sensor_module
-sys.modules["homeassistant.components.sensor"] = sensor_module
-sys.modules["homeassistant.components.switch"] = switch_module
+def _install_ha_stubs() -> None:
+    """Register the stub ``homeassistant`` and ``voluptuous`` modules in ``sys.modules``."""
+
+    ha = _ensure_module("homeassistant")
+    core = _ensure_module("homeassistant.core")
+    config_entries = _ensure_module("homeassistant.config_entries")
+    helpers = _ensure_module("homeassistant.helpers")
+    helpers.__path__ = []  # mark as package
+    helpers_event = types.ModuleType("homeassistant.helpers.event")
+    helpers_update = types.ModuleType("homeassistant.helpers.update_coordinator")
+    helpers_typing = types.ModuleType("homeassistant.helpers.typing")
+    components = _ensure_module("homeassistant.components")
+    components.__path__ = []
+    binary_sensor_module = types.ModuleType("homeassistant.components.binary_sensor")
+    sensor_module = types.ModuleType("homeassistant.components.sensor")
+    switch_module = types.ModuleType("homeassistant.components.switch")
+
+    voluptuous = types.ModuleType("voluptuous")
+    voluptuous.Invalid = Invalid
+    voluptuous.Schema = Schema
+    voluptuous.Required = Required
+    voluptuous.Optional = Optional
+    sys.modules["voluptuous"] = voluptuous
+
+    helpers_event.async_track_state_change_event = lambda hass, entity_ids, action: (lambda: None)
+    helpers_event.async_call_later = lambda hass, delay, action: (lambda: None)
+    helpers_update.DataUpdateCoordinator = DataUpdateCoordinator
+    helpers_update.CoordinatorEntity = CoordinatorEntity
+    sensor_module.SensorEntity = SensorEntity
+    sensor_module.SensorStateClass = SensorStateClass
+    binary_sensor_module.BinarySensorEntity = BinarySensorEntity
+    binary_sensor_module.BinarySensorDeviceClass = BinarySensorDeviceClass
+    switch_module.SwitchEntity = SwitchEntity
+
+    ha.core = core
+    ha.config_entries = config_entries
+    ha.helpers = helpers
+    ha.components = components
+
+    core.callback = callback
+    core.HomeAssistant = HomeAssistant
+    core.ServiceCall = ServiceCall
+    core.State = State
+    core.Event = Event
+    core.CALLBACK_TYPE = Callable[..., None]
+
+    config_entries.ConfigFlow = ConfigFlow
+    config_entries.OptionsFlow = OptionsFlow
+    config_entries.ConfigEntry = ConfigEntry
+    config_entries.FlowResult = FlowResult
+
+    helpers.update_coordinator = helpers_update
+    helpers.event = helpers_event
+    helpers.typing = helpers_typing
+    components.binary_sensor = binary_sensor_module
+    components.sensor = sensor_module
+    components.switch = switch_module
+
+    sys.modules["homeassistant.helpers.event"] = helpers_event
+    sys.modules["homeassistant.helpers.update_coordinator"] = helpers_update
+    sys.modules["homeassistant.helpers.typing"] = helpers_typing
+    sys.modules["homeassistant.components.binary_sensor"] = binary_sensor_module
+    sys.modules["homeassistant.components.sensor"] = sensor_module
+    sys.modules["homeassistant.components.switch"] = switch_module
+
+    ha._pg_stub_installed = True
+
+
+if not getattr(sys.modules.get("homeassistant"), "_pg_stub_installed", False):
+    _install_ha_stubs()
+
+# The component can only be imported once the stubs are in place.
+from custom_components.presence_graph import graph_engine as _pg_engine  # noqa: E402
+from custom_components.presence_graph import model as _pg_model  # noqa: E402
+
+
+def _drive[T](coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine that completes without suspending, skipping the event loop.
+
+    The Home Assistant stubs never await real I/O; a coroutine that does
+    suspend is a test bug and raises instead of silently hanging.
+    """
+
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coro.close()
+    raise RuntimeError("coroutine suspended; stubs must complete synchronously")
+
+
+@pytest.fixture
+def drive() -> Callable[[Coroutine[Any, Any, Any]], Any]:
+    return _drive
 
 
 @pytest.fixture
@@ -362,32 +405,28 @@ class ClockStub:
         self._value += seconds
 
 
-@pytest.fixture
-def sample_spaces() -> list:
-    from custom_components.presence_graph.model import Space
-
-    return [
-        Space(
+@pytest.fixture(scope="session")
+def space_templates() -> tuple:
+    return (
+        _pg_model.Space(
             id="living",
             name="Living Room",
             motion_entities=["binary_sensor.living_motion"],
             timeout_s=60,
         ),
-        Space(
+        _pg_model.Space(
             id="kitchen",
             name="Kitchen",
             motion_entities=["binary_sensor.kitchen_motion"],
             timeout_s=90,
         ),
-    ]
+    )
 
 
-@pytest.fixture
-def sample_links() -> list:
-    from custom_components.presence_graph.model import Link
-
-    return [
-        Link(
+@pytest.fixture(scope="session")
+def link_templates() -> tuple:
+    return (
+        _pg_model.Link(
             id="living_kitchen",
             name="Living to Kitchen",
             from_space="living",
@@ -395,12 +434,23 @@ def sample_links() -> list:
             motion_entities=["binary_sensor.link_motion"],
             contact_entities=["binary_sensor.link_contact"],
             lock_entities=["lock.link"],
-        )
-    ]
+        ),
+    )
 
 
 @pytest.fixture
-def engine(sample_spaces, sample_links, fake_clock):
-    from custom_components.presence_graph.graph_engine import GraphEngine
+def sample_spaces(space_templates) -> list:
+    # Only scalar fields such as include_in_total are ever mutated, so a
+    # shallow copy per space keeps the templates pristine.
+    return [copy.copy(space) for space in space_templates]
+
 
-    return GraphEngine(sample_spaces, sample_links, time_func=fake_clock.time)
+@pytest.fixture
+def sample_links(link_templates) -> list:
+    # Nothing mutates links; the templates can be shared as they are.
+    return list(link_templates)
+
+
+@pytest.fixture
+def engine(sample_spaces, sample_links, fake_clock):
+    return _pg_engine.GraphEngine(sample_spaces, sample_links, time_func=fake_clock.time)
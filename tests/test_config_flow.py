@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 
+import pytest
 from homeassistant.config_entries import ConfigEntry
 
 from custom_components.presence_graph.config_flow import (
@@ -10,44 +11,49 @@ from custom_components.presence_graph.config_flow import (
 )
 from custom_components.presence_graph.const import CONF_LINKS, CONF_SPACES
 
+_SPACES_PAYLOAD = "Salon\nCuisine"
+_LINKS_PAYLOAD = json.dumps(
+    [
+        {
+            "name": "Porte",
+            "from_space": "salon",
+            "to_space": "cuisine",
+            "motion_entities": ["binary_sensor.porte"],
+        }
+    ]
+)
+_OPTIONS_SPACES_PAYLOAD = json.dumps([{"name": "Chambre"}])
+_EMPTY_LINKS_PAYLOAD = json.dumps([])
+_DOOR_PAYLOAD = json.dumps([{"name": "Door", "from_space": "a", "to_space": "b"}])
+_BAD_DOOR_PAYLOAD = json.dumps([{"name": "Door", "from_space": "a", "to_space": 3}])
+
 
-def test_full_config_flow():
+def test_full_config_flow(drive):
     flow = PresenceGraphConfigFlow()
-    import asyncio
 
-    form = asyncio.run(flow.async_step_user(None))
+    form = drive(flow.async_step_user(None))
     assert form["type"] == "form"
-    asyncio.run(flow.async_step_user({"title": "Maison"}))
-    spaces_payload = "Salon\nCuisine"
-    asyncio.run(flow.async_step_spaces({"spaces": spaces_payload}))
-    links_payload = json.dumps(
-        [
-            {
-                "name": "Porte",
-                "from_space": "salon",
-                "to_space": "cuisine",
-                "motion_entities": ["binary_sensor.porte"],
-            }
-        ]
-    )
-    asyncio.run(flow.async_step_links({"links": links_payload}))
-    summary = asyncio.run(flow.async_step_summary({}))
+    drive(flow.async_step_user({"title": "Maison"}))
+    drive(flow.async_step_spaces({"spaces": _SPACES_PAYLOAD}))
+    drive(flow.async_step_links({"links": _LINKS_PAYLOAD}))
+    summary = drive(flow.async_step_summary({}))
     assert summary["type"] == "create_entry"
     assert len(summary["data"][CONF_SPACES]) == 2
     assert summary["data"][CONF_SPACES][0]["id"] == "salon"
     assert len(summary["data"][CONF_LINKS]) == 1
 
 
-def test_options_flow_update():
+def test_options_flow_update(drive):
     entry = ConfigEntry(data={CONF_SPACES: [], CONF_LINKS: []})
     handler = PresenceGraphOptionsFlowHandler(entry)
-    import asyncio
 
-    form = asyncio.run(handler.async_step_init(None))
+    form = drive(handler.async_step_init(None))
     assert form["type"] == "form"
-    spaces = json.dumps([{ "name": "Chambre" }])
-    links = json.dumps([])
-    result = asyncio.run(handler.async_step_init({"spaces": spaces, "links": links}))
+    result = drive(
+        handler.async_step_init(
+            {"spaces": _OPTIONS_SPACES_PAYLOAD, "links": _EMPTY_LINKS_PAYLOAD}
+        )
+    )
     assert result["type"] == "create_entry"
     assert result["data"][CONF_SPACES][0]["id"] == "chambre"
 
@@ -59,3 +65,14 @@ def test_parse_spaces_from_comma_separated_list():
     spaces = _parse_spaces(payload)
     assert [space["name"] for space in spaces] == ["Salon", "Cuisine", "Bureau"]
     assert [space["id"] for space in spaces] == ["salon", "cuisine", "bureau"]
+
+
+def test_parse_links_fills_defaults_and_rejects_bad_types():
+    from custom_components.presence_graph.config_flow import _parse_links
+
+    links = _parse_links(_DOOR_PAYLOAD)
+    assert links[0]["id"] == "a_b_door"
+    assert links[0]["traversal_latency_s"] == 8
+    assert links[0]["lock_entities"] == []
+    with pytest.raises(ValueError):
+        _parse_links(_BAD_DOOR_PAYLOAD)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import Event, HomeAssistant, State
+
+from custom_components.presence_graph import coordinator as coordinator_module
+from custom_components.presence_graph.const import (
+    CONF_LINKS,
+    CONF_SPACES,
+    EVENT_PRESENCE_GRAPH_UPDATE,
+)
+from custom_components.presence_graph.coordinator import PresenceGraphCoordinator
+
+_START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _state_event(entity_id: str, new: str, old: str, seconds: float) -> Event:
+    changed = _START + timedelta(seconds=seconds)
+    return Event(
+        {
+            "entity_id": entity_id,
+            "new_state": State(new, changed),
+            "old_state": State(old, changed - timedelta(seconds=5)),
+        }
+    )
+
+
+def _coordinator(drive, engine, sample_spaces, sample_links) -> PresenceGraphCoordinator:
+    hass = HomeAssistant()
+    entry = ConfigEntry(
+        data={
+            CONF_SPACES: [{"id": space.id, "name": space.name} for space in sample_spaces],
+            CONF_LINKS: [],
+        }
+    )
+    coordinator = PresenceGraphCoordinator(hass, entry, engine)
+    drive(coordinator.async_setup(sample_spaces, sample_links))
+    return coordinator
+
+
+def test_set_space_included_updates_only_target(drive, engine, sample_spaces, sample_links):
+    coordinator = _coordinator(drive, engine, sample_spaces, sample_links)
+    original = coordinator.config_entry.data[CONF_SPACES]
+
+    drive(coordinator.async_set_space_included("kitchen", False))
+
+    updated = coordinator.config_entry.options[CONF_SPACES]
+    assert [space["id"] for space in updated] == ["living", "kitchen"]
+    assert updated[0] is original[0]
+    assert updated[1]["include_in_total"] is False
+    assert "include_in_total" not in original[1]
+
+
+def test_state_bursts_are_coalesced(drive, engine, sample_spaces, sample_links, monkeypatch):
+    scheduled: list = []
+    monkeypatch.setattr(
+        coordinator_module,
+        "async_call_later",
+        lambda hass, delay, action: scheduled.append(action) or (lambda: None),
+    )
+    coordinator = _coordinator(drive, engine, sample_spaces, sample_links)
+    bus = coordinator.hass.bus
+
+    coordinator._handle_state_event(_state_event("binary_sensor.living_motion", "on", "off", 0))
+    assert coordinator.data.occupied["living"]
+    assert coordinator.occupied_spaces == ["living"]
+    assert coordinator.space_counts_json == '{"living":1,"kitchen":0}'
+    assert len(bus.events) == 1
+    assert len(scheduled) == 1
+
+    coordinator._handle_state_event(_state_event("binary_sensor.kitchen_motion", "on", "off", 1))
+    coordinator._handle_state_event(_state_event("binary_sensor.living_motion", "off", "on", 1))
+    assert not coordinator.data.occupied["kitchen"]
+    assert len(bus.events) == 1
+
+    scheduled[0](None)
+    assert coordinator.data.occupied["kitchen"]
+    assert coordinator.occupied_spaces == ["living", "kitchen"]
+    assert coordinator.space_counts_json == '{"living":1,"kitchen":1}'
+    assert len(bus.events) == 2
+    event_type, payload = bus.events[-1]
+    assert event_type == EVENT_PRESENCE_GRAPH_UPDATE
+    assert payload["changed"] == ["kitchen"]
+    assert payload["source_entity_id"] == "binary_sensor.kitchen_motion"
+    assert payload["space"] == "kitchen"
+
+
+def test_force_flushes_open_window(drive, engine, sample_spaces, sample_links, monkeypatch):
+    monkeypatch.setattr(
+        coordinator_module, "async_call_later", lambda hass, delay, action: lambda: None
+    )
+    coordinator = _coordinator(drive, engine, sample_spaces, sample_links)
+
+    coordinator._handle_state_event(_state_event("binary_sensor.living_motion", "on", "off", 0))
+    coordinator._handle_state_event(_state_event("binary_sensor.kitchen_motion", "on", "off", 1))
+    drive(coordinator.async_force_space_state("kitchen", False, 0.0))
+    assert not coordinator.data.occupied["kitchen"]
+
+    event_type, payload = coordinator.hass.bus.events[-1]
+    assert event_type == EVENT_PRESENCE_GRAPH_UPDATE
+    assert payload["source_entity_id"] == "service.force_space_state"
+
+    # Nothing queued is left to replay over the forced state when the window closes.
+    coordinator._async_flush_window(None)
+    assert not coordinator.data.occupied["kitchen"]
+    assert len(coordinator.hass.bus.events) == 3
+
+
+def test_unchanged_state_is_ignored(drive, engine, sample_spaces, sample_links, monkeypatch):
+    coordinator = _coordinator(drive, engine, sample_spaces, sample_links)
+    processed: list = []
+    process_event = engine.process_event
+    monkeypatch.setattr(
+        engine, "process_event", lambda event: processed.append(event) or process_event(event)
+    )
+
+    coordinator._handle_state_event(_state_event("lock.link", "locked", "locked", 0))
+    coordinator._handle_state_event(_state_event("lock.link", "locked", "unlocked", 1))
+    coordinator._handle_state_event(_state_event("lock.link", "locked", "unlocked", 2))
+    assert len(processed) == 1
+
+
+def test_update_event_only_fired_on_change(drive, engine, sample_spaces, sample_links):
+    coordinator = _coordinator(drive, engine, sample_spaces, sample_links)
+
+    coordinator._handle_state_event(_state_event("lock.link", "locked", "unlocked", 0))
+    assert coordinator.hass.bus.events == []
+
@@ -6,9 +6,11 @@ from custom_components.presence_graph.binary_sensor import PresenceGraphSpaceBin
 from custom_components.presence_graph.const import (
     ATTR_INCLUDE_IN_TOTAL,
     ATTR_LAST_EVENT,
+    ATTR_OCCUPIED_SPACES,
     ATTR_SCORE,
     ATTR_SPACE_COUNTS,
     ATTR_TOTAL_ESTIMATED,
+    ATTR_UPDATED_AT,
 )
 from custom_components.presence_graph.model import PresenceState, Space
 from custom_components.presence_graph.sensors import (
@@ -16,20 +18,23 @@ from custom_components.presence_graph.sensors import (
     PresenceGraphTotalSensor,
 )
 from custom_components.presence_graph.switch import PresenceGraphSpaceIncludeSwitch
+from custom_components.presence_graph.utils import json_dumps
 
 
 class DummyCoordinator:
     def __init__(self, data: PresenceState) -> None:
         self.data = data
-        self.calls: list[tuple[str, bool]] = []
+        self.last_call: tuple[str, bool] | None = None
         self.config_entry = type("ConfigEntry", (), {"entry_id": "entry"})()
+        self.updated_at_iso = "2024-01-01T00:00:00+00:00"
+        self.occupied_spaces = [space_id for space_id, active in data.occupied.items() if active]
+        self.space_counts_json = json_dumps(data.space_counts)
 
     async def async_set_space_included(self, space_id: str, include: bool) -> None:
-        self.calls.append((space_id, include))
+        self.last_call = (space_id, include)
 
 
-@pytest.fixture
-def presence_state() -> PresenceState:
+def _presence_state() -> PresenceState:
     return PresenceState(
         occupied={"living": True, "kitchen": False},
         scores={"living": 0.9, "kitchen": 0.1},
@@ -39,8 +44,19 @@ def presence_state() -> PresenceState:
     )
 
 
-def test_binary_sensor_attributes(presence_state):
-    coordinator = DummyCoordinator(presence_state)
+# Entities only read the state, so one state and coordinator serve the module;
+# tests that mutate either build their own.
+@pytest.fixture(scope="module")
+def presence_state() -> PresenceState:
+    return _presence_state()
+
+
+@pytest.fixture(scope="module")
+def coordinator(presence_state) -> DummyCoordinator:
+    return DummyCoordinator(presence_state)
+
+
+def test_binary_sensor_attributes(coordinator):
     space = Space(id="living", name="Living", motion_entities=["binary_sensor.motion"])
     entity = PresenceGraphSpaceBinarySensor(coordinator, space, ["kitchen"])
     attrs = entity.extra_state_attributes
@@ -49,29 +65,37 @@ def test_binary_sensor_attributes(presence_state):
     assert attrs[ATTR_INCLUDE_IN_TOTAL]
 
 
-def test_total_sensor_attributes(presence_state):
+def test_binary_sensor_without_activation_has_no_last_event():
+    presence_state = _presence_state()
+    presence_state.last_event_ts["kitchen"] = float("-inf")
     coordinator = DummyCoordinator(presence_state)
+    space = Space(id="kitchen", name="Kitchen")
+    entity = PresenceGraphSpaceBinarySensor(coordinator, space, ["living"])
+    assert entity.extra_state_attributes[ATTR_LAST_EVENT] is None
+
+
+def test_total_sensor_attributes(coordinator):
     entry = type("Entry", (), {"entry_id": "entry"})()
     entity = PresenceGraphTotalSensor(coordinator, entry)
     attrs = entity.extra_state_attributes
     assert attrs[ATTR_TOTAL_ESTIMATED] == 1
     assert attrs[ATTR_SPACE_COUNTS]["living"] == 1
+    assert attrs[ATTR_OCCUPIED_SPACES] == ["living"]
+    assert attrs[ATTR_UPDATED_AT] == coordinator.updated_at_iso
 
 
-def test_space_count_sensor_value(presence_state):
-    coordinator = DummyCoordinator(presence_state)
+def test_space_count_sensor_value(coordinator):
     entry = type("Entry", (), {"entry_id": "entry"})()
     sensor = PresenceGraphSpaceCountSensor(coordinator, entry)
-    assert sensor.native_value != "-"
+    assert sensor.native_value == '{"living":1,"kitchen":0}'
 
 
-def test_switch_updates_inclusion(presence_state):
+def test_switch_updates_inclusion(presence_state, drive):
     coordinator = DummyCoordinator(presence_state)
     entry = type("Entry", (), {"entry_id": "entry"})()
     space = Space(id="living", name="Living")
     switch = PresenceGraphSpaceIncludeSwitch(coordinator, space, entry)
-    import asyncio
 
-    asyncio.run(switch.async_turn_off())
-    assert coordinator.calls == [("living", False)]
+    drive(switch.async_turn_off())
+    assert coordinator.last_call == ("living", False)
     assert not space.include_in_total
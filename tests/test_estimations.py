@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import sys
+
 from custom_components.presence_graph.graph_engine import GraphEvent
 
+_LIVING = sys.intern("binary_sensor.living_motion")
+_KITCHEN = sys.intern("binary_sensor.kitchen_motion")
+
 
 def test_total_estimation_clusters(engine, fake_clock):
-    engine.process_event(GraphEvent("binary_sensor.living_motion", "on", "off", fake_clock.time()))
+    engine.process_event(GraphEvent(_LIVING, "on", "off", fake_clock.time()))
     fake_clock.advance(1)
-    engine.process_event(GraphEvent("binary_sensor.kitchen_motion", "on", "off", fake_clock.time()))
+    engine.process_event(GraphEvent(_KITCHEN, "on", "off", fake_clock.time()))
     state = engine.current_state()
     assert state.total_estimated == 1
 
@@ -24,3 +29,14 @@ def test_set_space_inclusion(engine):
     engine.force_space_state("kitchen", True, 0.9)
     state = engine.current_state()
     assert state.total_estimated == 1
+
+
+def test_count_components_follows_neighbour_bits():
+    from custom_components.presence_graph.graph_engine import _count_components
+
+    # 0 - 1 - 2 form a chain, 3 is isolated.
+    neighbours = (0b0010, 0b0101, 0b0010, 0b0000)
+    assert _count_components(0b0000, neighbours) == 0
+    assert _count_components(0b0111, neighbours) == 1
+    assert _count_components(0b0101, neighbours) == 2
+    assert _count_components(0b1111, neighbours) == 2
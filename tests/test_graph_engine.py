@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 import pytest
 
 from custom_components.presence_graph.const import (
@@ -8,21 +10,20 @@ from custom_components.presence_graph.const import (
 )
 from custom_components.presence_graph.graph_engine import GraphEvent
 
+_LIVING = sys.intern("binary_sensor.living_motion")
+_KITCHEN = sys.intern("binary_sensor.kitchen_motion")
+_LINK_M = sys.intern("binary_sensor.link_motion")
+_LOCK = sys.intern("lock.link")
+
 
 def _event(
     entity_id: str, new_state: str, ts: float, duration: float | None = None
 ) -> GraphEvent:
-    return GraphEvent(
-        entity_id=entity_id,
-        new_state=new_state,
-        old_state="off",
-        timestamp=ts,
-        duration=duration,
-    )
+    return GraphEvent(entity_id, new_state, "off", ts, duration)
 
 
 def test_space_activation_sets_occupied(engine, fake_clock):
-    evt = _event("binary_sensor.living_motion", "on", fake_clock.time())
+    evt = _event(_LIVING, "on", fake_clock.time())
     update = engine.process_event(evt)
     assert "living" in update.changed
     state = engine.current_state()
@@ -33,13 +34,55 @@ def test_space_activation_sets_occupied(engine, fake_clock):
     assert state.scores["living"] < 1.0
 
 
+def test_occupancy_uses_unrounded_score(engine, fake_clock):
+    engine.process_event(_event(_LIVING, "on", fake_clock.time()))
+    fake_clock.advance(47.98)
+    state = engine.current_state()
+    assert state.scores["living"] == 0.2
+    assert state.occupied["living"]
+
+    update = engine.force_space_state("kitchen", False, 0.2004)
+    assert update.state.scores["kitchen"] == 0.2
+    assert update.state.occupied["kitchen"]
+
+
+def test_activation_schedules_decay_from_its_own_timestamp(engine, fake_clock, monkeypatch):
+    passes: list[float] = []
+    apply_decay = engine._apply_decay
+    monkeypatch.setattr(engine, "_apply_decay", lambda now: passes.append(now) or apply_decay(now))
+
+    fake_clock.advance(5)
+    engine.process_event(_event(_LIVING, "on", fake_clock.time()))
+    engine.process_event(_event(_KITCHEN, "off", fake_clock.time()))
+    assert passes == []
+
+    # Re-activation must not schedule from the previous event either.
+    fake_clock.advance(10)
+    engine.process_event(_event(_LIVING, "on", fake_clock.time()))
+    passes.clear()
+    engine.process_event(_event(_KITCHEN, "off", fake_clock.time()))
+    assert passes == []
+    assert engine.current_state().scores["living"] == 1.0
+
+
+def test_unmapped_event_after_activation_is_free(engine, fake_clock, monkeypatch):
+    engine.process_event(_event(_LIVING, "on", fake_clock.time()))
+    calls: list[str] = []
+    monkeypatch.setattr(engine, "_apply_decay", lambda now: calls.append("decay"))
+    monkeypatch.setattr(engine, "_recalculate_totals", lambda: calls.append("totals"))
+
+    update = engine.process_event(GraphEvent("sensor.unrelated", "on", "off", fake_clock.time()))
+    assert update.changed == []
+    assert calls == []
+
+
 def test_link_propagation(engine, fake_clock):
     engine.process_event(
-        _event("binary_sensor.living_motion", "on", fake_clock.time())
+        _event(_LIVING, "on", fake_clock.time())
     )
     fake_clock.advance(2)
     update = engine.process_event(
-        _event("binary_sensor.link_motion", "on", fake_clock.time())
+        _event(_LINK_M, "on", fake_clock.time())
     )
     assert "kitchen" in update.changed
     state = engine.current_state()
@@ -48,12 +91,12 @@ def test_link_propagation(engine, fake_clock):
 
 def test_lock_blocks_traversal(engine, fake_clock):
     engine.process_event(
-        _event("binary_sensor.living_motion", "on", fake_clock.time())
+        _event(_LIVING, "on", fake_clock.time())
     )
-    engine.process_event(GraphEvent("lock.link", "locked", "unlocked", fake_clock.time()))
+    engine.process_event(GraphEvent(_LOCK, "locked", "unlocked", fake_clock.time()))
     fake_clock.advance(1)
     update = engine.process_event(
-        _event("binary_sensor.link_motion", "on", fake_clock.time())
+        _event(_LINK_M, "on", fake_clock.time())
     )
     assert update.changed == []
     state = engine.current_state()
@@ -64,19 +107,44 @@ def test_global_count_with_exclusion(engine, fake_clock, sample_spaces, sample_l
     sample_spaces[1].include_in_total = False
     engine.set_model(sample_spaces, sample_links)
     engine.process_event(
-        _event("binary_sensor.living_motion", "on", fake_clock.time())
+        _event(_LIVING, "on", fake_clock.time())
     )
     fake_clock.advance(1)
     engine.process_event(
-        _event("binary_sensor.link_motion", "on", fake_clock.time())
+        _event(_LINK_M, "on", fake_clock.time())
     )
     state = engine.current_state()
     assert state.total_estimated == 1
 
 
+def test_set_model_resets_existing_state(engine, fake_clock, sample_spaces, sample_links):
+    engine.process_event(_event(_LIVING, "on", fake_clock.time()))
+    engine.process_event(GraphEvent(_LOCK, "locked", "unlocked", fake_clock.time()))
+    fake_clock.advance(1)
+    engine.process_event(_event(_KITCHEN, "on", fake_clock.time()))
+    assert engine.current_state().total_estimated == 1
+
+    sample_spaces[0].include_in_total = False
+    engine.set_model(sample_spaces, sample_links)
+    state = engine.current_state()
+    assert state.scores == {"living": 0.0, "kitchen": 0.0}
+    assert not any(state.occupied.values())
+    assert state.total_estimated == 0
+    assert engine.describe()["spaces"]["living"]["include_in_total"] is False
+
+    # The lock was dropped with the old model, so traversal works again.
+    fake_clock.advance(1)
+    engine.process_event(_event(_KITCHEN, "on", fake_clock.time()))
+    fake_clock.advance(1)
+    update = engine.process_event(_event(_LINK_M, "on", fake_clock.time()))
+    assert update.changed == ["living"]
+    assert update.state.occupied["living"]
+    assert update.state.total_estimated == 1
+
+
 def test_ignore_short_pulse(engine, fake_clock):
     update = engine.process_event(
-        _event("binary_sensor.living_motion", "on", fake_clock.time(), duration=0.1)
+        _event(_LIVING, "on", fake_clock.time(), duration=0.1)
     )
     assert update.changed == []
     state = engine.current_state()
@@ -84,9 +152,27 @@ def test_ignore_short_pulse(engine, fake_clock):
 
 
 def test_decay_reason_when_idle(engine, fake_clock):
-    evt = _event("binary_sensor.living_motion", "on", fake_clock.time())
+    evt = _event(_LIVING, "on", fake_clock.time())
     update = engine.process_event(evt)
     assert update.reason == ATTR_REASON_SENSOR
     fake_clock.advance(300)
     decayed = engine.process_event(GraphEvent("unknown", "off", "on", fake_clock.time()))
     assert decayed.reason == ATTR_REASON_DECAY
+
+
+def test_describe_tracks_inclusion_changes(engine):
+    assert engine.describe()["spaces"]["kitchen"]["include_in_total"] is True
+    engine.set_space_inclusion("kitchen", False)
+    assert engine.describe()["spaces"]["kitchen"]["include_in_total"] is False
+
+
+def test_describe_result_does_not_alias_engine_caches(engine):
+    described = engine.describe()
+    described["spaces"]["kitchen"]["include_in_total"] = "redacted"
+    described["links"].clear()
+    described["adjacency"]["living"].append("attic")
+
+    fresh = engine.describe()
+    assert fresh["spaces"]["kitchen"]["include_in_total"] is True
+    assert fresh["links"]
+    assert "attic" not in fresh["adjacency"]["living"]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.presence_graph import _entry_model, async_setup, async_setup_entry
+from custom_components.presence_graph.const import (
+    CONF_LINKS,
+    CONF_SPACES,
+    DATA_COORDINATOR,
+    DOMAIN,
+    SERVICE_RELOAD_MODEL,
+)
+
+
+def test_entry_model_reuses_unchanged_instances():
+    living = {
+        "id": "living",
+        "name": "Living",
+        "include_in_total": True,
+        "motion_entities": [],
+        "presence_entities": [],
+        "timeout_s": 120,
+    }
+    entry = ConfigEntry(data={CONF_SPACES: [living, {**living, "id": "office"}], CONF_LINKS: []})
+    previous = _entry_model(entry)
+
+    entry.options = {CONF_SPACES: [living, {**living, "id": "office", "timeout_s": 30}]}
+    model = _entry_model(entry, previous)
+
+    assert model["spaces"][0] is previous["spaces"][0]
+    assert model["spaces"][1] is not previous["spaces"][1]
+    assert model["spaces"][1].timeout_s == 30
+
+
+def test_reload_service_uses_updated_options(drive):
+    hass = HomeAssistant()
+    entry = ConfigEntry(
+        data={
+            CONF_SPACES: [{"id": "living", "name": "Living"}, {"id": "kitchen", "name": "Kitchen"}],
+            CONF_LINKS: [],
+        }
+    )
+    hass.config_entries.add_entry(entry)
+    drive(async_setup(hass, {}))
+    drive(async_setup_entry(hass, entry))
+    coordinator = hass.data[DOMAIN][entry.entry_id][DATA_COORDINATOR]
+    living = coordinator.engine.describe()["spaces"]["living"]
+
+    entry.options = {
+        CONF_SPACES: [{"id": "living", "name": "Living"}, {"id": "office", "name": "Office"}],
+        CONF_LINKS: [
+            {"id": "door", "name": "Door", "from_space": "living", "to_space": "office"}
+        ],
+    }
+    for listener in entry._update_listeners:
+        drive(listener(hass, entry))
+    assert coordinator.engine.space_ids() == ["living", "office"]
+
+    coordinator.engine.force_space_state("office", True)
+    drive(hass.services.async_call(DOMAIN, SERVICE_RELOAD_MODEL))
+
+    state = coordinator.engine.current_state()
+    assert coordinator.engine.space_ids() == ["living", "office"]
+    assert coordinator.engine.link_ids() == ["door"]
+    assert coordinator.adjacency == {"living": ("office",), "office": ("living",)}
+    assert not state.occupied["office"]
+    assert coordinator.engine.describe()["spaces"]["living"] == living